@@ -4,32 +4,139 @@ Treasurer Agent - Blockchain Funding Distribution
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
 from ..shared.base_agent import BaseAgent
 from ..shared.models import VerifiedEvent, FundingTransaction
 from ..shared.blockchain import BlockchainManager
+from ..shared.clock import utc_now_iso
+
+
+# Funding multiplier per disaster type (unknown types use 1.0)
+_DISASTER_MULTIPLIERS: Dict[str, float] = {
+    'fire': 1.0,
+    'flood': 1.2,
+    'structural': 1.1,
+    'casualty': 1.5
+}
+
+
+@dataclass
+class _PendingTx:
+    """Tracked funding transaction with its per-recipient send results"""
+    __slots__ = ('funding_transaction', 'transaction_results', 'created_at', 'created_monotonic')
+    
+    funding_transaction: FundingTransaction
+    transaction_results: List[Dict[str, Any]]
+    created_at: datetime
+    created_monotonic: float  # time.monotonic() at creation, for timeout checks
+
+
+class _TxTable:
+    """Index of funding transaction amounts and statuses with running totals
+    
+    Per-status counts and amounts are maintained incrementally on every add and
+    status change, so reading stats is O(1) and survives eviction of old entries.
+    """
+    
+    STATUSES = ('pending', 'confirmed', 'failed', 'timeout', 'stopped')
+    
+    def __init__(self):
+        self.entries: Dict[str, Tuple[float, str]] = {}  # transaction id -> (amount, status)
+        
+        # Lifetime totals per status
+        self.status_counts: Dict[str, int] = dict.fromkeys(self.STATUSES, 0)
+        self.status_amounts: Dict[str, float] = dict.fromkeys(self.STATUSES, 0.0)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def add(self, tx_id: str, amount: float, status: str = 'pending'):
+        """Track a new transaction"""
+        self.entries[tx_id] = (amount, status)
+        self.status_counts[status] += 1
+        self.status_amounts[status] += amount
+    
+    def set_status(self, tx_id: str, status: str):
+        """Record a status change for a tracked transaction"""
+        entry = self.entries.get(tx_id)
+        if entry is None or entry[1] == status:
+            return
+        
+        amount, old_status = entry
+        self.entries[tx_id] = (amount, status)
+        self.status_counts[old_status] -= 1
+        self.status_counts[status] += 1
+        self.status_amounts[status] += amount
+        if self.status_counts[old_status]:
+            self.status_amounts[old_status] -= amount
+        else:
+            # Reset instead of subtracting so float error cannot accumulate
+            self.status_amounts[old_status] = 0.0
+    
+    def retire(self, tx_id: str):
+        """Stop tracking a transaction; its contribution to the totals is kept"""
+        self.entries.pop(tx_id, None)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Counts and amounts split into pending and completed"""
+        pending_count = self.status_counts['pending']
+        pending_amount = self.status_amounts['pending']
+        
+        return {
+            'pending_count': pending_count,
+            'completed_count': sum(self.status_counts.values()) - pending_count,
+            'pending_amount': pending_amount,
+            'completed_amount': sum(self.status_amounts.values()) - pending_amount,
+            'status_counts': dict(self.status_counts)
+        }
 
 
 class TreasurerAgent(BaseAgent):
     """Agent responsible for blockchain funding distribution"""
     
-    def __init__(self, config: Dict[str, Any]):
+    # Fallbacks for verified events missing scoring fields
+    default_verification_score = 80
+    default_human_impact = 100
+    
+    def __init__(self, config: Dict[str, Any], blockchain: Optional[BlockchainManager] = None):
         super().__init__("treasurer", config)
         
-        # Initialize blockchain manager
-        blockchain_config = config.get('blockchain', {})
-        self.blockchain = BlockchainManager(blockchain_config)
+        # Initialize blockchain manager, unless a shared one is provided
+        if blockchain is None:
+            blockchain = BlockchainManager(config.get('blockchain', {}))
+        self.blockchain = blockchain
         
         # Funding configuration
         self.min_funding_amount = config.get('min_funding_amount', 0.01)  # ETH
         self.max_funding_amount = config.get('max_funding_amount', 2.0)   # ETH
         self.funding_timeout = config.get('funding_timeout', 300)  # seconds
+        self.pending_check_interval = config.get('pending_check_interval', self.funding_timeout / 10)  # seconds
+        self.idle_poll_interval = config.get('idle_poll_interval', 0.1)  # seconds, after an empty receive
+        self.max_burst_size = config.get('max_burst_size', 32)  # messages drained and priced together
+        self.balance_cache_ttl = config.get('balance_cache_ttl', 15)  # seconds
+        
+        # Last fetched account balance as (balance_eth, time.monotonic() of fetch)
+        self._balance_cache: Optional[Tuple[float, float]] = None
+        self._insufficient_logged_at: Optional[float] = None  # throttles short-circuit warnings
         
-        # Transaction tracking
+        # Transaction tracking; completed history keeps only the most recent entries
+        self.max_completed_transactions = config.get('max_completed_transactions', 4096)
         self.pending_transactions = {}
         self.completed_transactions = {}
+        self._tx_table = _TxTable()
+        
+        # Set whenever a transaction is added to pending_transactions; created in start()
+        # so it binds to the running event loop
+        self._pending_nonempty: Optional[asyncio.Event] = None
+        
+        # Processing loop failures in a row, for exponential backoff
+        self._consecutive_errors = 0
+        self.max_error_backoff = config.get('max_error_backoff', 5)  # seconds
         
     async def start(self):
         """Start the treasurer agent"""
@@ -39,8 +146,18 @@ class TreasurerAgent(BaseAgent):
             self.logger.error("Failed to connect to blockchain - agent cannot start")
             return
         
-        # Start the base agent
-        await super().start()
+        self._pending_nonempty = asyncio.Event()
+        if self.pending_transactions:
+            self._pending_nonempty.set()
+        
+        # Pending transaction checks run independently of message handling
+        pending_task = asyncio.create_task(self._pending_checker())
+        
+        try:
+            # Start the base agent
+            await super().start()
+        finally:
+            pending_task.cancel()
     
     async def _processing_loop(self):
         """Main processing loop for funding distribution"""
@@ -48,41 +165,82 @@ class TreasurerAgent(BaseAgent):
         
         while self.is_running:
             try:
-                # Process new verified events
-                messages = await self.receive_messages()
+                if not self.message_queue:
+                    # Nothing can arrive without a queue - avoid spinning
+                    await asyncio.sleep(self.pending_check_interval)
+                    continue
                 
-                for message in messages:
-                    await self.process_message(message.payload)
+                # Blocks on the queue (BRPOP) until a message arrives or the timeout expires
+                messages = await self.receive_messages()
+                if messages:
+                    # Drain whatever else is already queued so a burst is priced in one pass
+                    messages += await self.message_queue.consume_batch(
+                        self.name, self.max_burst_size - len(messages)
+                    )
                 
-                # Check pending transaction statuses
-                await self._check_pending_transactions()
+                await self._process_burst(messages)
                 
-                # Small delay to prevent busy waiting
-                await asyncio.sleep(2)
+                self._consecutive_errors = 0
+                if messages:
+                    # More may be queued; yield so other tasks run between messages
+                    await asyncio.sleep(0)
+                else:
+                    # A queue that returns immediately (e.g. after a Redis error) must not spin the loop
+                    await asyncio.sleep(self.idle_poll_interval)
                 
             except Exception as e:
                 self.logger.error(f"Error in processing loop: {e}")
+                # Back off briefly after a single blip, longer only when errors repeat
+                self._consecutive_errors += 1
+                await asyncio.sleep(min(self.max_error_backoff, 0.05 * 2 ** self._consecutive_errors))
+    
+    async def _pending_checker(self):
+        """Check pending transactions periodically, sleeping while there are none"""
+        while self.is_running:
+            try:
+                if not self.pending_transactions:
+                    self._pending_nonempty.clear()
+                    await self._pending_nonempty.wait()
+                    continue
+                
+                await self._check_pending_transactions()
+                await asyncio.sleep(self.pending_check_interval)
+                
+            except Exception as e:
+                self.logger.error(f"Error in pending transaction checker: {e}")
                 await asyncio.sleep(5)
     
+    async def _process_burst(self, messages: List[Any]):
+        """Process received messages, pricing several verified events in one batch pass"""
+        verified_events = {}  # message index -> parsed event
+        for index, message in enumerate(messages):
+            if 'verified_event' in message.payload:
+                try:
+                    verified_events[index] = VerifiedEvent.from_dict(message.payload['verified_event'])
+                except Exception:
+                    pass  # process_message reports it below
+        
+        funding_amounts = {}
+        if len(verified_events) > 1:
+            try:
+                amounts = self._calculate_funding_amounts_batch(list(verified_events.values()))
+                funding_amounts = dict(zip(verified_events, amounts.tolist()))
+            except Exception as e:
+                # Fall back to pricing each event on its own
+                self.logger.error(f"Error calculating batch funding amounts: {e}")
+        
+        for index, message in enumerate(messages):
+            if index in verified_events:
+                await self._fund_verified_event(verified_events[index], funding_amounts.get(index))
+            else:
+                await self.process_message(message.payload)
+    
     async def process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Process incoming verified disaster event"""
         try:
             if 'verified_event' in message:
                 verified_event = VerifiedEvent.from_dict(message['verified_event'])
-                funding_transaction = await self.distribute_funding(verified_event)
-                
-                if funding_transaction:
-                    self.logger.info(f"Funding initiated for event {verified_event.event_id}: "
-                                   f"{funding_transaction.total_amount} ETH")
-                    
-                    return {
-                        'status': 'funding_initiated',
-                        'transaction_id': funding_transaction.transaction_id,
-                        'total_amount': funding_transaction.total_amount
-                    }
-                else:
-                    self.logger.warning(f"Failed to initiate funding for event {verified_event.event_id}")
-                    return {'status': 'funding_failed'}
+                return await self._fund_verified_event(verified_event)
             
             return {'status': 'no_event_to_fund'}
             
@@ -90,20 +248,59 @@ class TreasurerAgent(BaseAgent):
             self.logger.error(f"Error processing message: {e}")
             return {'status': 'error', 'error': str(e)}
     
-    async def distribute_funding(self, verified_event: VerifiedEvent) -> Optional[FundingTransaction]:
-        """Distribute funding based on verified disaster event"""
+    async def _fund_verified_event(self, verified_event: VerifiedEvent,
+                                   funding_amount: Optional[float] = None) -> Dict[str, Any]:
+        """Fund a parsed verified event and report the outcome"""
+        try:
+            funding_transaction = await self.distribute_funding(verified_event, funding_amount)
+            
+            if funding_transaction:
+                self.logger.info(f"Funding initiated for event {verified_event.event_id}: "
+                               f"{funding_transaction.total_amount} ETH")
+                
+                return {
+                    'status': 'funding_initiated',
+                    'transaction_id': funding_transaction.transaction_id,
+                    'total_amount': funding_transaction.total_amount
+                }
+            else:
+                self.logger.warning(f"Failed to initiate funding for event {verified_event.event_id}")
+                return {'status': 'funding_failed'}
+            
+        except Exception as e:
+            self.logger.error(f"Error processing message: {e}")
+            return {'status': 'error', 'error': str(e)}
+    
+    async def distribute_funding(self, verified_event: VerifiedEvent,
+                                 funding_amount: Optional[float] = None) -> Optional[FundingTransaction]:
+        """Distribute funding based on verified disaster event
+        
+        funding_amount may be precomputed, e.g. by a batch pass over a burst of events.
+        """
         try:
             # Calculate funding amount
-            funding_amount = self._calculate_funding_amount(verified_event)
+            if funding_amount is None:
+                funding_amount = self._calculate_funding_amount(verified_event)
             
             if funding_amount < self.min_funding_amount:
                 self.logger.info(f"Funding amount {funding_amount} below minimum threshold")
                 return None
             
-            # Check account balance
-            balance = await self.blockchain.get_balance()
-            if balance < funding_amount:
-                self.logger.error(f"Insufficient balance: {balance} ETH, needed: {funding_amount} ETH")
+            # Check account balance; a fresh cached balance that is short bails out without any await
+            balance = self._fresh_cached_balance()
+            if balance is None:
+                balance = await self._fetch_balance()
+                if balance is None:
+                    return None
+                if balance < funding_amount:
+                    self.logger.error(f"Insufficient balance: {balance} ETH, needed: {funding_amount} ETH")
+                    return None
+            elif balance < funding_amount:
+                now = time.monotonic()
+                if self._insufficient_logged_at is None or now - self._insufficient_logged_at >= self.balance_cache_ttl:
+                    self._insufficient_logged_at = now
+                    self.logger.warning(f"Skipping funding, cached balance {balance} ETH "
+                                        f"is below needed {funding_amount} ETH")
                 return None
             
             # Get recipient addresses
@@ -112,6 +309,15 @@ class TreasurerAgent(BaseAgent):
             
             # Execute transactions
             transaction_results = await self.blockchain.send_multiple_transactions(recipient_amounts)
+            sent_results = [r for r in transaction_results if r.get('status') == 'sent']
+            if not sent_results:
+                self.logger.error(f"No transactions sent for event {verified_event.event_id}")
+                return None
+            # Each transfer also pays gas; leaving it out would overstate the cached balance
+            self._debit_cached_balance(
+                sum(r['amount'] for r in sent_results)
+                + len(sent_results) * self.blockchain.transfer_fee_eth()
+            )
             
             # Create funding transaction record
             funding_transaction = FundingTransaction(
@@ -126,11 +332,15 @@ class TreasurerAgent(BaseAgent):
             )
             
             # Store in pending transactions for monitoring
-            self.pending_transactions[funding_transaction.transaction_id] = {
-                'funding_transaction': funding_transaction,
-                'transaction_results': transaction_results,
-                'created_at': datetime.utcnow()
-            }
+            self.pending_transactions[funding_transaction.transaction_id] = _PendingTx(
+                funding_transaction=funding_transaction,
+                transaction_results=transaction_results,
+                created_at=datetime.utcnow(),
+                created_monotonic=time.monotonic()
+            )
+            self._tx_table.add(funding_transaction.transaction_id, funding_amount)
+            if self._pending_nonempty:
+                self._pending_nonempty.set()
             
             return funding_transaction
             
@@ -138,9 +348,44 @@ class TreasurerAgent(BaseAgent):
             self.logger.error(f"Error distributing funding: {e}")
             return None
     
+    async def get_balance(self, refresh: bool = False) -> float:
+        """Get account balance in ETH, cached for balance_cache_ttl seconds (0.0 if unavailable)"""
+        if not refresh:
+            cached_balance = self._fresh_cached_balance()
+            if cached_balance is not None:
+                return cached_balance
+        
+        balance = await self._fetch_balance()
+        return 0.0 if balance is None else balance
+    
+    async def _fetch_balance(self) -> Optional[float]:
+        """Fetch the balance over RPC, caching only successful fetches; None on error"""
+        try:
+            balance = await self.blockchain.fetch_balance()
+        except Exception as e:
+            self.logger.error(f"Error fetching balance: {e}")
+            return None
+        
+        self._balance_cache = (balance, time.monotonic())
+        return balance
+    
+    def _fresh_cached_balance(self) -> Optional[float]:
+        """Cached balance if fetched within balance_cache_ttl seconds, else None"""
+        if self._balance_cache and time.monotonic() - self._balance_cache[1] < self.balance_cache_ttl:
+            return self._balance_cache[0]
+        return None
+    
+    def _debit_cached_balance(self, amount: float):
+        """Optimistically subtract sent funds and gas from the cached balance until the next refresh"""
+        if self._balance_cache and amount > 0:
+            balance, fetched_at = self._balance_cache
+            self._balance_cache = (max(0.0, balance - amount), fetched_at)
+    
     def _calculate_funding_amount(self, verified_event: VerifiedEvent) -> float:
         """Calculate funding amount based on verified event"""
         try:
+            # Scalar arithmetic: building NumPy arrays for a batch of one costs more than it saves
+            
             # Start with the recommended amount from auditor
             base_amount = getattr(verified_event, 'funding_recommendation', self.min_funding_amount)
             
@@ -149,38 +394,77 @@ class TreasurerAgent(BaseAgent):
                 base_amount = self.min_funding_amount
             
             # Adjust based on verification score
-            verification_factor = getattr(verified_event, 'verification_score', 80) / 100.0
+            verification_factor = getattr(verified_event, 'verification_score', self.default_verification_score) / 100.0
             
             # Adjust based on human impact
-            human_impact = getattr(verified_event, 'human_impact_estimate', 100)
+            human_impact = getattr(verified_event, 'human_impact_estimate', self.default_human_impact)
             impact_factor = min(2.0, human_impact / 1000.0)
             
             # Adjust based on disaster type
-            disaster_multipliers = {
-                'fire': 1.0,
-                'flood': 1.2,
-                'structural': 1.1,
-                'casualty': 1.5
-            }
-            
-            disaster_type = verified_event.original_event.disaster_type
-            disaster_factor = disaster_multipliers.get(disaster_type, 1.0)
+            disaster_factor = _DISASTER_MULTIPLIERS.get(verified_event.original_event.disaster_type, 1.0)
             
             # Calculate final amount
             final_amount = base_amount * verification_factor * impact_factor * disaster_factor
             
-            # Ensure it's at least the minimum
-            final_amount = max(self.min_funding_amount, final_amount)
-            
-            # Apply max limit
-            final_amount = min(self.max_funding_amount, final_amount)
+            # Clamp to [min, max] and round to 6 decimal places for small amounts
+            final_amount = min(self.max_funding_amount, max(self.min_funding_amount, final_amount))
             
-            return round(final_amount, 6)  # Round to 6 decimal places for small amounts
+            return round(final_amount, 6)
             
         except Exception as e:
             self.logger.error(f"Error calculating funding amount: {e}")
             return self.min_funding_amount
     
+    def _calculate_funding_amounts_batch(self, verified_events: List[VerifiedEvent]) -> np.ndarray:
+        """Calculate funding amounts for a batch of verified events in one vectorized pass
+        
+        Matches _calculate_funding_amount per event; used for bursts drained by the processing loop.
+        """
+        count = len(verified_events)
+        
+        # Bind hot-path lookups once for the generator loops below
+        min_amount = self.min_funding_amount
+        max_amount = self.max_funding_amount
+        default_score = self.default_verification_score
+        default_impact = self.default_human_impact
+        multiplier = _DISASTER_MULTIPLIERS.get
+        
+        # Start with the recommended amount from auditor
+        base_amount = np.fromiter(
+            (getattr(e, 'funding_recommendation', min_amount) for e in verified_events),
+            dtype=float, count=count
+        )
+        
+        # If base amount is 0 or very small, use minimum
+        base_amount = np.where(base_amount <= 0, min_amount, base_amount)
+        
+        # Adjust based on verification score
+        verification_factor = np.fromiter(
+            (getattr(e, 'verification_score', default_score) for e in verified_events),
+            dtype=float, count=count
+        ) / 100.0
+        
+        # Adjust based on human impact
+        human_impact = np.fromiter(
+            (getattr(e, 'human_impact_estimate', default_impact) for e in verified_events),
+            dtype=float, count=count
+        )
+        impact_factor = np.minimum(2.0, human_impact / 1000.0)
+        
+        # Adjust based on disaster type
+        disaster_factor = np.fromiter(
+            (multiplier(e.original_event.disaster_type, 1.0) for e in verified_events),
+            dtype=float, count=count
+        )
+        
+        # Calculate final amount
+        final_amount = base_amount * verification_factor * impact_factor * disaster_factor
+        
+        # Clamp to [min, max] and round to 6 decimal places for small amounts
+        final_amount = np.clip(final_amount, min_amount, max_amount)
+        
+        return final_amount.round(6)
+    
     def _get_recipients(self, verified_event: VerifiedEvent) -> List[Dict[str, Any]]:
         """Get recipient addresses and percentages based on disaster type"""
         disaster_type = verified_event.original_event.disaster_type
@@ -190,23 +474,39 @@ class TreasurerAgent(BaseAgent):
         """Check status of pending transactions"""
         completed_ids = []
         
+        # Bind hot-path lookups once per pass
+        logger = self.logger
+        timeout = self.funding_timeout
+        
+        # Look up every pending hash in one concurrent batch
+        tx_hashes = [
+            result['transaction_hash']
+            for tx_data in self.pending_transactions.values()
+            for result in tx_data.transaction_results
+            if 'transaction_hash' in result
+        ]
+        statuses = {}
+        if tx_hashes:
+            results = await self.blockchain.get_transaction_statuses(tx_hashes)
+            statuses = {tx_hash: status['status'] for tx_hash, status in zip(tx_hashes, results)}
+        
+        now = time.monotonic()
         for tx_id, tx_data in self.pending_transactions.items():
             try:
-                funding_transaction = tx_data['funding_transaction']
-                transaction_results = tx_data['transaction_results']
+                funding_transaction = tx_data.funding_transaction
+                transaction_results = tx_data.transaction_results
                 
                 # Check each transaction hash
                 all_confirmed = True
                 any_failed = False
                 
-                for i, result in enumerate(transaction_results):
+                for result in transaction_results:
                     if 'transaction_hash' in result:
-                        tx_hash = result['transaction_hash']
-                        status = await self.blockchain.get_transaction_status(tx_hash)
+                        status = statuses.get(result['transaction_hash'])
                         
-                        if status['status'] == 'confirmed':
+                        if status == 'confirmed':
                             continue
-                        elif status['status'] == 'failed':
+                        elif status == 'failed':
                             any_failed = True
                             break
                         else:
@@ -216,26 +516,38 @@ class TreasurerAgent(BaseAgent):
                 if any_failed:
                     funding_transaction.status = 'failed'
                     completed_ids.append(tx_id)
-                    self.logger.error(f"Transaction {tx_id} failed")
+                    logger.error(f"Transaction {tx_id} failed")
                 elif all_confirmed:
                     funding_transaction.status = 'confirmed'
                     completed_ids.append(tx_id)
-                    self.logger.info(f"Transaction {tx_id} confirmed")
+                    logger.info(f"Transaction {tx_id} confirmed")
                 
                 # Check for timeout
-                time_elapsed = (datetime.utcnow() - tx_data['created_at']).total_seconds()
-                if time_elapsed > self.funding_timeout:
+                if now - tx_data.created_monotonic > timeout:
                     funding_transaction.status = 'timeout'
                     completed_ids.append(tx_id)
-                    self.logger.warning(f"Transaction {tx_id} timed out")
+                    logger.warning(f"Transaction {tx_id} timed out")
                 
             except Exception as e:
-                self.logger.error(f"Error checking transaction {tx_id}: {e}")
+                logger.error(f"Error checking transaction {tx_id}: {e}")
+        
+        self._complete_transactions(completed_ids)
+    
+    def _complete_transactions(self, tx_ids: List[str]):
+        """Move transactions from pending to completed, evicting the oldest completed entries"""
+        pending = self.pending_transactions
+        done_ids = [tx_id for tx_id in dict.fromkeys(tx_ids) if tx_id in pending]
+        
+        completed = {tx_id: pending.pop(tx_id) for tx_id in done_ids}
+        self.completed_transactions.update(completed)
+        for tx_id, tx_data in completed.items():
+            self._tx_table.set_status(tx_id, tx_data.funding_transaction.status)
         
-        # Move completed transactions
-        for tx_id in completed_ids:
-            if tx_id in self.pending_transactions:
-                self.completed_transactions[tx_id] = self.pending_transactions.pop(tx_id)
+        # Dicts keep insertion order, so the first keys are the oldest completions
+        while len(self.completed_transactions) > self.max_completed_transactions:
+            tx_id = next(iter(self.completed_transactions))
+            del self.completed_transactions[tx_id]
+            self._tx_table.retire(tx_id)
     
     async def get_transaction_status(self, transaction_id: str) -> Optional[Dict[str, Any]]:
         """Get status of a specific transaction"""
@@ -243,7 +555,7 @@ class TreasurerAgent(BaseAgent):
             # Check pending transactions
             if transaction_id in self.pending_transactions:
                 tx_data = self.pending_transactions[transaction_id]
-                funding_transaction = tx_data['funding_transaction']
+                funding_transaction = tx_data.funding_transaction
                 
                 return {
                     'transaction_id': transaction_id,
@@ -256,7 +568,7 @@ class TreasurerAgent(BaseAgent):
             # Check completed transactions
             if transaction_id in self.completed_transactions:
                 tx_data = self.completed_transactions[transaction_id]
-                funding_transaction = tx_data['funding_transaction']
+                funding_transaction = tx_data.funding_transaction
                 
                 return {
                     'transaction_id': transaction_id,
@@ -276,41 +588,30 @@ class TreasurerAgent(BaseAgent):
     async def get_funding_stats(self) -> Dict[str, Any]:
         """Get funding statistics"""
         try:
-            total_pending = len(self.pending_transactions)
-            total_completed = len(self.completed_transactions)
-            
-            # Calculate total amounts
-            pending_amount = sum(
-                tx_data['funding_transaction'].total_amount 
-                for tx_data in self.pending_transactions.values()
-            )
-            
-            completed_amount = sum(
-                tx_data['funding_transaction'].total_amount 
-                for tx_data in self.completed_transactions.values()
-            )
+            summary = self._tx_table.summary()
+            pending_amount = summary['pending_amount']
+            completed_amount = summary['completed_amount']
             
             # Count by status
-            status_counts = {'confirmed': 0, 'failed': 0, 'timeout': 0}
-            for tx_data in self.completed_transactions.values():
-                status = tx_data['funding_transaction'].status
-                if status in status_counts:
-                    status_counts[status] += 1
+            status_counts = {
+                status: summary['status_counts'][status]
+                for status in ('confirmed', 'failed', 'timeout')
+            }
             
             # Get blockchain info
-            network_info = self.blockchain.get_network_info()
-            account_balance = await self.blockchain.get_balance()
+            network_info = await self.blockchain.get_network_info()
+            account_balance = await self.get_balance()
             
             return {
-                'pending_transactions': total_pending,
-                'completed_transactions': total_completed,
+                'pending_transactions': summary['pending_count'],
+                'completed_transactions': summary['completed_count'],
                 'pending_amount_eth': pending_amount,
                 'completed_amount_eth': completed_amount,
                 'total_amount_eth': pending_amount + completed_amount,
                 'status_distribution': status_counts,
                 'account_balance_eth': account_balance,
                 'network_info': network_info,
-                'last_updated': datetime.utcnow().isoformat()
+                'last_updated': utc_now_iso()
             }
             
         except Exception as e:
@@ -326,11 +627,10 @@ class TreasurerAgent(BaseAgent):
             pending_count = len(self.pending_transactions)
             
             # Move all pending to completed with 'stopped' status
-            for tx_id, tx_data in self.pending_transactions.items():
-                tx_data['funding_transaction'].status = 'stopped'
-                self.completed_transactions[tx_id] = tx_data
+            for tx_data in self.pending_transactions.values():
+                tx_data.funding_transaction.status = 'stopped'
             
-            self.pending_transactions.clear()
+            self._complete_transactions(list(self.pending_transactions))
             
             return {
                 'status': 'emergency_stop_activated',
@@ -349,7 +649,7 @@ class TreasurerAgent(BaseAgent):
                 return {'status': 'transaction_not_found'}
             
             tx_data = self.completed_transactions[transaction_id]
-            funding_transaction = tx_data['funding_transaction']
+            funding_transaction = tx_data.funding_transaction
             
             if funding_transaction.status != 'failed':
                 return {'status': 'transaction_not_failed'}
@@ -73,6 +73,10 @@ class WatchtowerAgent(BaseAgent):
     
     async def analyze_image(self, image_input: ImageInput) -> Optional[DisasterEvent]:
         """Analyze image for disaster indicators"""
+        return self._analyze_image(image_input)
+    
+    def _analyze_image(self, image_input: ImageInput) -> Optional[DisasterEvent]:
+        """Analyze image for disaster indicators (synchronous; detection is CPU-bound)"""
         try:
             # Convert bytes to OpenCV image
             image = self._bytes_to_cv2_image(image_input.image_data)
@@ -85,7 +89,7 @@ class WatchtowerAgent(BaseAgent):
                 coordinates = (0.0, 0.0)  # Default coordinates
             
             # Perform disaster detection
-            disaster_results = await self._detect_disasters(image)
+            disaster_results = self._detect_disasters(image)
             
             # Find the highest confidence disaster
             best_disaster = None
@@ -158,25 +162,25 @@ class WatchtowerAgent(BaseAgent):
             self.logger.error(f"Error extracting coordinates: {e}")
             return None
     
-    async def _detect_disasters(self, image: np.ndarray) -> Dict[str, float]:
+    def _detect_disasters(self, image: np.ndarray) -> Dict[str, float]:
         """Detect various types of disasters in the image"""
         results = {}
         
         # Fire detection (looking for red/orange areas and smoke)
-        results['fire'] = await self._detect_fire(image)
+        results['fire'] = self._detect_fire(image)
         
         # Flood detection (looking for water coverage)
-        results['flood'] = await self._detect_flood(image)
+        results['flood'] = self._detect_flood(image)
         
         # Structural damage detection
-        results['structural'] = await self._detect_structural_damage(image)
+        results['structural'] = self._detect_structural_damage(image)
         
         # Casualty detection (simplified - looking for human-like shapes)
-        results['casualty'] = await self._detect_casualties(image)
+        results['casualty'] = self._detect_casualties(image)
         
         return results
     
-    async def _detect_fire(self, image: np.ndarray) -> float:
+    def _detect_fire(self, image: np.ndarray) -> float:
         """Detect fire indicators in the image"""
         try:
             # Convert to HSV for better color detection
@@ -214,7 +218,7 @@ class WatchtowerAgent(BaseAgent):
             self.logger.error(f"Error in fire detection: {e}")
             return 0.0
     
-    async def _detect_flood(self, image: np.ndarray) -> float:
+    def _detect_flood(self, image: np.ndarray) -> float:
         """Detect flood indicators in the image"""
         try:
             # Convert to HSV
@@ -241,7 +245,7 @@ class WatchtowerAgent(BaseAgent):
             self.logger.error(f"Error in flood detection: {e}")
             return 0.0
     
-    async def _detect_structural_damage(self, image: np.ndarray) -> float:
+    def _detect_structural_damage(self, image: np.ndarray) -> float:
         """Detect structural damage in the image"""
         try:
             # Convert to grayscale for edge detection
@@ -273,7 +277,7 @@ class WatchtowerAgent(BaseAgent):
             self.logger.error(f"Error in structural damage detection: {e}")
             return 0.0
     
-    async def _detect_casualties(self, image: np.ndarray) -> float:
+    def _detect_casualties(self, image: np.ndarray) -> float:
         """Detect potential casualties in the image"""
         try:
             # This is a simplified approach - in reality, you'd use YOLO or similar
@@ -338,6 +342,10 @@ class WatchtowerAgent(BaseAgent):
     
     async def process_test_image(self, image_path: str, coordinates: Tuple[float, float] = None):
         """Process a test image file (for testing purposes)"""
+        return self.analyze_test_image(image_path, coordinates)
+    
+    def analyze_test_image(self, image_path: str, coordinates: Tuple[float, float] = None):
+        """Synchronous process_test_image, for running inference in a worker thread"""
         try:
             with open(image_path, 'rb') as f:
                 image_data = f.read()
@@ -350,7 +358,7 @@ class WatchtowerAgent(BaseAgent):
                 metadata={}
             )
             
-            result = await self.analyze_image(image_input)
+            result = self._analyze_image(image_input)
             return result
             
         except Exception as e:
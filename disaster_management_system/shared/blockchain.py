@@ -4,8 +4,11 @@ Blockchain integration for Sepolia testnet transactions
 
 import logging
 import os
+import time
 from typing import Dict, Any, List, Optional
+from requests.exceptions import HTTPError
 from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
 from eth_account import Account
 from datetime import datetime
 import asyncio
@@ -30,8 +33,20 @@ class BlockchainManager:
         self.gas_limit = config.get('gas_limit', 21000)
         self.gas_price = config.get('gas_price', 20000000000)  # 20 Gwei
         
+        # Outbound RPC limits to stay under provider rate limits
+        self.rpc_concurrency = config.get('rpc_concurrency', 10)
+        self.rpc_max_retries = config.get('rpc_max_retries', 3)
+        self.rpc_retry_delay = config.get('rpc_retry_delay', 0.5)  # seconds, doubled per retry
+        self._rpc_semaphore = None
+        self._rpc_semaphore_loop = None
+        
+        # Serializes nonce reservation through broadcast so concurrent sends never share a nonce
+        self._nonce_lock = None
+        self._nonce_lock_loop = None
+        
         # Initialize Web3
         self.w3 = Web3(Web3.HTTPProvider(self.network_url))
+        self.connected = False  # set by connect()
         
         # Default recipient addresses (NGOs, government agencies) - using your address for testing
         self.default_recipients = config.get('default_recipients', {
@@ -58,7 +73,7 @@ class BlockchainManager:
     async def connect(self) -> bool:
         """Connect to blockchain network"""
         try:
-            if not self.w3.is_connected():
+            if not await self._rpc(self.w3.is_connected):
                 self.logger.error("Failed to connect to blockchain network")
                 return False
             
@@ -71,28 +86,64 @@ class BlockchainManager:
             balance = await self.get_balance()
             self.logger.info(f"Connected to Sepolia testnet. Account: {self.address}, Balance: {balance} ETH")
             
+            self.connected = True
             return True
             
         except Exception as e:
             self.logger.error(f"Error connecting to blockchain: {e}")
             return False
     
+    def _get_rpc_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding in-flight RPCs, created for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._rpc_semaphore_loop is not loop:
+            self._rpc_semaphore = asyncio.Semaphore(self.rpc_concurrency)
+            self._rpc_semaphore_loop = loop
+        return self._rpc_semaphore
+    
+    def _get_nonce_lock(self) -> asyncio.Lock:
+        """Lock held from reading the nonce until the transactions using it are broadcast"""
+        loop = asyncio.get_running_loop()
+        if self._nonce_lock_loop is not loop:
+            self._nonce_lock = asyncio.Lock()
+            self._nonce_lock_loop = loop
+        return self._nonce_lock
+    
+    async def _rpc(self, func, *args):
+        """Run a blocking Web3 call in a worker thread, bounded by rpc_concurrency
+        and retried with exponential backoff when the provider answers HTTP 429"""
+        delay = self.rpc_retry_delay
+        for attempt in range(self.rpc_max_retries + 1):
+            try:
+                async with self._get_rpc_semaphore():
+                    return await asyncio.to_thread(func, *args)
+            except HTTPError as e:
+                rate_limited = e.response is not None and e.response.status_code == 429
+                if not rate_limited or attempt == self.rpc_max_retries:
+                    raise
+            
+            self.logger.warning(f"RPC rate limited, retrying in {delay}s")
+            await asyncio.sleep(delay)
+            delay *= 2
+    
     async def get_balance(self, address: str = None) -> float:
-        """Get ETH balance for an address"""
+        """Get ETH balance for an address, 0.0 if it cannot be fetched"""
         try:
-            target_address = address or self.address
-            if not target_address:
-                return 0.0
-            
-            balance_wei = self.w3.eth.get_balance(target_address)
-            balance_eth = self.w3.from_wei(balance_wei, 'ether')
-            
-            return float(balance_eth)
+            return await self.fetch_balance(address)
             
         except Exception as e:
             self.logger.error(f"Error getting balance: {e}")
             return 0.0
     
+    async def fetch_balance(self, address: str = None) -> float:
+        """Get ETH balance for an address, raising on RPC errors"""
+        target_address = address or self.address
+        if not target_address:
+            return 0.0
+        
+        balance_wei = await self._rpc(self.w3.eth.get_balance, target_address)
+        return float(self.w3.from_wei(balance_wei, 'ether'))
+    
     async def send_transaction(self, to_address: str, amount_eth: float, 
                              gas_limit: int = None, gas_price: int = None) -> Optional[str]:
         """Send ETH transaction"""
@@ -106,30 +157,17 @@ class BlockchainManager:
                 self.logger.error(f"Invalid recipient address: {to_address}")
                 return None
             
-            # Convert to checksum address
-            to_address = self.w3.to_checksum_address(to_address)
-            
-            # Convert ETH to Wei
-            amount_wei = self.w3.to_wei(amount_eth, 'ether')
-            
-            # Get current nonce
-            nonce = self.w3.eth.get_transaction_count(self.address)
-            
-            # Build transaction
-            transaction = {
-                'to': to_address,
-                'value': amount_wei,
-                'gas': gas_limit or self.gas_limit,
-                'gasPrice': gas_price or self.gas_price,
-                'nonce': nonce,
-                'chainId': 11155111  # Sepolia chain ID
-            }
-            
-            # Sign transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.private_key)
-            
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+            async with self._get_nonce_lock():
+                # Get next nonce, counting our own transactions still in the mempool
+                nonce = await self._rpc(self.w3.eth.get_transaction_count, self.address, 'pending')
+                
+                # Build and sign transaction off the event loop (ECDSA signing is CPU-bound)
+                signed_txn = await asyncio.to_thread(
+                    self._sign_transaction, to_address, amount_eth, nonce, gas_limit, gas_price
+                )
+                
+                # Send transaction
+                tx_hash = await self._rpc(self.w3.eth.send_raw_transaction, signed_txn.raw_transaction)
             tx_hash_hex = tx_hash.hex()
             
             self.logger.info(f"Transaction sent: {tx_hash_hex}")
@@ -139,55 +177,117 @@ class BlockchainManager:
             self.logger.error(f"Error sending transaction: {e}")
             return None
     
+    def _sign_transaction(self, to_address: str, amount_eth: float, nonce: int,
+                          gas_limit: int = None, gas_price: int = None):
+        """Build and sign a transfer to an already validated address"""
+        # Build transaction
+        transaction = {
+            'to': self.w3.to_checksum_address(to_address),
+            'value': self.w3.to_wei(amount_eth, 'ether'),
+            'gas': gas_limit or self.gas_limit,
+            'gasPrice': gas_price or self.gas_price,
+            'nonce': nonce,
+            'chainId': 11155111  # Sepolia chain ID
+        }
+        
+        return self.w3.eth.account.sign_transaction(transaction, self.private_key)
+    
     async def send_multiple_transactions(self, recipients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Send multiple transactions to different recipients"""
+        """Send multiple transactions to different recipients, signed concurrently"""
         results = []
+        valid = []  # (result index, address, amount)
         
         for recipient in recipients:
             address = recipient.get('address')
             amount = recipient.get('amount', 0.0)
             recipient_type = recipient.get('type', 'unknown')
             
+            result = {
+                'address': address,
+                'amount': amount,
+                'type': recipient_type,
+                'status': 'failed'
+            }
+            results.append(result)
+            
             if not address or amount <= 0:
-                results.append({
-                    'address': address,
-                    'amount': amount,
-                    'type': recipient_type,
-                    'status': 'failed',
-                    'error': 'Invalid address or amount'
-                })
+                result['error'] = 'Invalid address or amount'
+                continue
+            
+            # Validate before reserving a nonce so invalid recipients leave no gaps
+            if not self.w3.is_address(address):
+                self.logger.error(f"Invalid recipient address: {address}")
+                result['error'] = 'Transaction failed'
                 continue
             
-            # Send transaction
-            tx_hash = await self.send_transaction(address, amount)
+            valid.append((len(results) - 1, address, amount))
+        
+        if not self.account:
+            self.logger.error("No account configured for transactions")
+            for index, _, _ in valid:
+                results[index]['error'] = 'Transaction failed'
+            return results
+        
+        if not valid:
+            return results
+        
+        async with self._get_nonce_lock():
+            # Reserve a consecutive nonce per transaction, counting our own unconfirmed ones
+            try:
+                nonce = await self._rpc(self.w3.eth.get_transaction_count, self.address, 'pending')
+            except Exception as e:
+                self.logger.error(f"Error getting nonce: {e}")
+                for index, _, _ in valid:
+                    results[index]['error'] = 'Transaction failed'
+                return results
             
-            if tx_hash:
-                results.append({
-                    'address': address,
-                    'amount': amount,
-                    'type': recipient_type,
-                    'status': 'sent',
-                    'transaction_hash': tx_hash
-                })
-            else:
-                results.append({
-                    'address': address,
-                    'amount': amount,
-                    'type': recipient_type,
-                    'status': 'failed',
-                    'error': 'Transaction failed'
-                })
+            # Sign in worker threads so CPU-bound ECDSA does not stall the event loop
+            signed = await asyncio.gather(
+                *(asyncio.to_thread(self._sign_transaction, address, amount, nonce + offset)
+                  for offset, (_, address, amount) in enumerate(valid)),
+                return_exceptions=True
+            )
             
-            # Small delay between transactions to avoid nonce issues
-            await asyncio.sleep(1)
+            # Broadcast in nonce order and stop at the first failure: anything after
+            # a missing nonce would be stuck behind the gap and collide with the next batch
+            failed = False
+            for (index, _, _), signed_txn in zip(valid, signed):
+                result = results[index]
+                if failed:
+                    result['error'] = 'Skipped after an earlier transaction in the batch failed'
+                    continue
+                
+                try:
+                    if isinstance(signed_txn, Exception):
+                        raise signed_txn
+                    tx_hash = await self._rpc(self.w3.eth.send_raw_transaction, signed_txn.raw_transaction)
+                except Exception as e:
+                    self.logger.error(f"Error sending transaction: {e}")
+                    result['error'] = 'Transaction failed'
+                    failed = True
+                    continue
+                
+                tx_hash_hex = tx_hash.hex()
+                self.logger.info(f"Transaction sent: {tx_hash_hex}")
+                result['status'] = 'sent'
+                result['transaction_hash'] = tx_hash_hex
         
         return results
     
-    async def wait_for_confirmation(self, tx_hash: str, timeout: int = 300) -> Optional[Dict[str, Any]]:
+    async def wait_for_confirmation(self, tx_hash: str, timeout: int = 300,
+                                    poll_latency: float = 0.1) -> Optional[Dict[str, Any]]:
         """Wait for transaction confirmation"""
         try:
-            # Wait for transaction receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+            # Poll for the receipt through _rpc rather than blocking a thread for the whole wait
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    receipt = await self._rpc(self.w3.eth.get_transaction_receipt, tx_hash)
+                    break
+                except TransactionNotFound:
+                    if time.monotonic() >= deadline:
+                        raise TimeExhausted(f"Transaction {tx_hash} is not in the chain after {timeout} seconds")
+                    await asyncio.sleep(poll_latency)
             
             return {
                 'transaction_hash': tx_hash,
@@ -205,11 +305,15 @@ class BlockchainManager:
                 'error': str(e)
             }
     
+    async def get_transaction_statuses(self, tx_hashes: List[str]) -> List[Dict[str, Any]]:
+        """Get status for several transactions concurrently, in the order given"""
+        return await asyncio.gather(*(self.get_transaction_status(tx_hash) for tx_hash in tx_hashes))
+    
     async def get_transaction_status(self, tx_hash: str) -> Dict[str, Any]:
         """Get transaction status"""
         try:
             # Try to get transaction receipt
-            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            receipt = await self._rpc(self.w3.eth.get_transaction_receipt, tx_hash)
             
             return {
                 'transaction_hash': tx_hash,
@@ -221,7 +325,7 @@ class BlockchainManager:
         except Exception:
             # Transaction might be pending
             try:
-                tx = self.w3.eth.get_transaction(tx_hash)
+                tx = await self._rpc(self.w3.eth.get_transaction, tx_hash)
                 return {
                     'transaction_hash': tx_hash,
                     'status': 'pending',
@@ -287,10 +391,14 @@ class BlockchainManager:
         
         return result
     
+    def transfer_fee_eth(self) -> float:
+        """Maximum gas cost in ETH of one transfer at the configured gas limit and price"""
+        return float(self.w3.from_wei(self.gas_limit * self.gas_price, 'ether'))
+    
     async def estimate_gas_price(self) -> int:
         """Estimate current gas price"""
         try:
-            gas_price = self.w3.eth.gas_price
+            gas_price = await self._rpc(lambda: self.w3.eth.gas_price)
             # Add 10% buffer
             return int(gas_price * 1.1)
         except Exception as e:
@@ -304,11 +412,14 @@ class BlockchainManager:
         except Exception:
             return False
     
-    def get_network_info(self) -> Dict[str, Any]:
+    async def get_network_info(self) -> Dict[str, Any]:
         """Get network information"""
         try:
-            latest_block = self.w3.eth.block_number
-            gas_price = self.w3.eth.gas_price
+            latest_block, gas_price, connected = await asyncio.gather(
+                self._rpc(lambda: self.w3.eth.block_number),
+                self._rpc(lambda: self.w3.eth.gas_price),
+                self._rpc(self.w3.is_connected)
+            )
             
             return {
                 'network': 'Sepolia Testnet',
@@ -316,7 +427,7 @@ class BlockchainManager:
                 'latest_block': latest_block,
                 'gas_price': gas_price,
                 'gas_price_gwei': self.w3.from_wei(gas_price, 'gwei'),
-                'connected': self.w3.is_connected(),
+                'connected': connected,
                 'account_address': self.address
             }
         except Exception as e:
@@ -0,0 +1,21 @@
+"""
+Cheap UTC timestamps for frequently polled endpoints
+"""
+
+import time
+from datetime import datetime
+
+# (time.time() when formatted, ISO string), replaced as a whole so readers never see a torn pair
+_cached_timestamp = (0.0, '')
+
+
+def utc_now_iso(resolution: float = 1.0) -> str:
+    """Current UTC time in ISO format, reformatted at most once per `resolution` seconds"""
+    global _cached_timestamp
+    
+    now = time.time()
+    formatted_at, formatted = _cached_timestamp
+    if abs(now - formatted_at) >= resolution:
+        formatted = datetime.utcfromtimestamp(now).isoformat()
+        _cached_timestamp = (now, formatted)
+    return formatted
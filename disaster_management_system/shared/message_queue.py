@@ -58,8 +58,9 @@ class MessageQueue:
         mock_queue = MockMessageQueue()
         await mock_queue.connect()
         
-        # Replace this instance with mock
+        # Replace this instance with mock; queue operations are delegated to it
         self.__dict__.update(mock_queue.__dict__)
+        self._mock_queue = mock_queue
         self.use_mock = True
     
     async def disconnect(self):
@@ -71,8 +72,7 @@ class MessageQueue:
     async def publish(self, sender: str, recipient: str, payload: Dict[str, Any]):
         """Publish message to recipient's queue"""
         if self.use_mock:
-            # This will be handled by mock implementation
-            return
+            return await self._mock_queue.publish(sender, recipient, payload)
             
         message = QueueMessage(
             message_id="",  # Will be auto-generated
@@ -95,8 +95,7 @@ class MessageQueue:
     async def consume(self, agent_name: str, timeout: int = 1) -> List[QueueMessage]:
         """Consume messages from agent's queue"""
         if self.use_mock:
-            # This will be handled by mock implementation
-            return []
+            return await self._mock_queue.consume(agent_name, timeout)
             
         queue_name = f"queue:{agent_name}"
         messages = []
@@ -116,6 +115,9 @@ class MessageQueue:
     
     async def consume_batch(self, agent_name: str, batch_size: int = 10) -> List[QueueMessage]:
         """Consume multiple messages at once"""
+        if self.use_mock:
+            return await self._mock_queue.consume_batch(agent_name, batch_size)
+            
         queue_name = f"queue:{agent_name}"
         messages = []
         
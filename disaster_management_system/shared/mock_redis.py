@@ -17,6 +17,7 @@ class MockRedis:
         self.data = defaultdict(deque)
         self.logger = logging.getLogger("mock_redis")
         self.connected = False
+        self._waiters: Dict[str, asyncio.Event] = {}
     
     async def ping(self):
         """Mock ping"""
@@ -25,6 +26,11 @@ class MockRedis:
     async def lpush(self, key: str, value: str):
         """Mock left push"""
         self.data[key].appendleft(value)
+        
+        # Wake up any consumer blocked in brpop on this key
+        waiter = self._waiters.get(key)
+        if waiter:
+            waiter.set()
         return len(self.data[key])
     
     async def rpop(self, key: str):
@@ -35,8 +41,17 @@ class MockRedis:
     
     async def brpop(self, key: str, timeout: int = 1):
         """Mock blocking right pop"""
-        # Simple non-blocking implementation for testing
         result = await self.rpop(key)
+        if not result:
+            # Block until lpush signals the key or the timeout expires (0 = forever, like Redis)
+            waiter = self._waiters.setdefault(key, asyncio.Event())
+            waiter.clear()
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout or None)
+            except asyncio.TimeoutError:
+                return None
+            result = await self.rpop(key)
+        
         if result:
             return (key.encode(), result)
         return None
@@ -132,6 +147,25 @@ class MockMessageQueue:
         
         return messages
     
+    async def consume_batch(self, agent_name: str, batch_size: int = 10) -> List:
+        """Consume up to batch_size already-queued messages without blocking"""
+        from .models import QueueMessage
+        
+        queue_name = f"queue:{agent_name}"
+        messages = []
+        
+        try:
+            for _ in range(batch_size):
+                result = await self.redis.rpop(queue_name)
+                if not result:
+                    break
+                
+                messages.append(QueueMessage.from_json(result.decode()))
+        except Exception as e:
+            self.logger.error(f"Failed to consume batch for {agent_name}: {e}")
+        
+        return messages
+    
     async def get_queue_size(self, agent_name: str) -> int:
         """Get the size of an agent's queue"""
         queue_name = f"queue:{agent_name}"
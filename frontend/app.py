@@ -7,7 +7,12 @@ from flask import Flask, render_template, jsonify, request, send_from_directory
 import os
 import sys
 import asyncio
+import threading
+import time
 import json
+import uuid
+import dataclasses
+from collections import OrderedDict
 from datetime import datetime
 
 # Try to import flask-limiter, but make it optional
@@ -19,13 +24,23 @@ except ImportError:
     LIMITER_AVAILABLE = False
     print("Warning: flask-limiter not available, rate limiting disabled")
 
+# Use orjson for hot JSON endpoints when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Add parent directory to path to import disaster management system
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from disaster_management_system.shared.clock import utc_now_iso
+
 try:
     from disaster_management_system.agents.watchtower import WatchtowerAgent
     from disaster_management_system.agents.auditor import AuditorAgent
     from disaster_management_system.agents.treasurer import TreasurerAgent
+    from disaster_management_system.shared.blockchain import BlockchainManager
     from disaster_management_system.shared.logging_config import setup_logging
     SYSTEM_AVAILABLE = True
 except ImportError:
@@ -48,19 +63,172 @@ else:
             def decorator(f):
                 return f
             return decorator
+        
+        def exempt(self, f):
+            return f
     limiter = DummyLimiter()
 
-# Global variables for agents
-watchtower = None
-auditor = None
-treasurer = None
+def fast_jsonify(payload, status=200):
+    """Build a JSON response with orjson, falling back to Flask's jsonify"""
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY)
+        return app.response_class(body, status=status, mimetype='application/json')
+    return jsonify(payload), status
 
-def initialize_agents():
-    """Initialize disaster management agents"""
-    global watchtower, auditor, treasurer
+# Demo test image, resolved once at startup
+TEST_IMAGE_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_images', 'intense_fire.jpg'))
+TEST_IMAGE_EXISTS = os.path.isfile(TEST_IMAGE_PATH)
+TEST_COORDINATES = (34.0522, -118.2437)
+
+# Agents are created lazily on first use and shared by all requests
+_agents = None
+_agents_lock = threading.Lock()
+
+# Blockchain connection retries, backing off from the minimum to the maximum delay
+BLOCKCHAIN_RETRY_MIN = 5  # seconds
+BLOCKCHAIN_RETRY_MAX = 300  # seconds
+_blockchain_retry_at = 0.0  # time.monotonic() of the next allowed attempt
+_blockchain_retry_delay = BLOCKCHAIN_RETRY_MIN
+_blockchain_connect_lock = threading.Lock()
+
+# Persistent event loop for agent coroutines, running in a background thread
+_event_loop = None
+_event_loop_lock = threading.Lock()
+ASYNC_TIMEOUT = 30  # seconds
+
+def get_event_loop():
+    """Get the background event loop, starting it on first use"""
+    global _event_loop
+    
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, daemon=True).start()
+    return _event_loop
+
+def run_async(coro, timeout=ASYNC_TIMEOUT):
+    """Run a coroutine on the background event loop and wait for its result"""
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        future.cancel()
+        raise
+
+# LRU cache of detection results keyed by (image path, mtime_ns, coordinates).
+# Only touched from the background loop, so it needs no lock.
+detection_cache = OrderedDict()
+MAX_DETECTION_CACHE = 32
+
+async def detect_disaster(watchtower, image_path, coordinates):
+    """Run watchtower detection on an image, reusing the result while the file is unchanged"""
+    key = (os.path.abspath(image_path), os.stat(image_path).st_mtime_ns, coordinates)
     
+    if key in detection_cache:
+        detection_cache.move_to_end(key)
+        result = detection_cache[key]
+    else:
+        # Inference (file read + OpenCV) is synchronous; keep it off the shared loop
+        result = await asyncio.to_thread(watchtower.analyze_test_image, image_path, coordinates)
+        detection_cache[key] = result
+        if len(detection_cache) > MAX_DETECTION_CACHE:
+            detection_cache.popitem(last=False)
+    
+    # Each detection is reported as a new event
+    if result:
+        result = dataclasses.replace(result, event_id=str(uuid.uuid4()), timestamp=datetime.utcnow())
+    return result
+
+# Disaster detection jobs running on the background loop: job_id -> concurrent Future
+detection_jobs = OrderedDict()
+detection_jobs_lock = threading.Lock()
+MAX_DETECTION_JOBS = 100
+
+def submit_detection_job(image_path, coordinates):
+    """Start disaster detection on the background loop and return its job ID"""
+    job_id = str(uuid.uuid4())
+    future = asyncio.run_coroutine_threadsafe(
+        detect_disaster(get_agents()[0], image_path, coordinates), get_event_loop()
+    )
+    
+    with detection_jobs_lock:
+        detection_jobs[job_id] = future
+        # Forget the oldest jobs nobody collected
+        while len(detection_jobs) > MAX_DETECTION_JOBS:
+            detection_jobs.popitem(last=False)
+    return job_id
+
+def detection_response(result):
+    """Build the API response for a disaster detection result"""
+    if not result:
+        return {'status': 'no_disaster'}
+    
+    return {
+        'status': 'success',
+        'disaster_type': result.disaster_type.upper(),
+        'confidence': int(result.confidence * 100),
+        'severity': result.severity_score,
+        'coordinates': f"({result.coordinates[0]}, {result.coordinates[1]})"
+    }
+
+def get_agents():
+    """Get (watchtower, auditor, treasurer), creating them on first call
+    
+    Returns None when the disaster management system is unavailable or failed to initialize;
+    a failed initialization is retried on the next call.
+    """
+    global _agents
+    
+    if _agents is None:
+        with _agents_lock:
+            if _agents is None:
+                agents = _create_agents()
+                if agents:
+                    ensure_blockchain_connected(agents[2].blockchain)
+                    _agents = agents
+    return _agents
+
+def agents_initialized():
+    """Whether agents have been created, without triggering creation"""
+    return bool(_agents)
+
+def ensure_blockchain_connected(blockchain):
+    """Connect the shared blockchain manager if it is not connected yet
+    
+    Failed attempts back off exponentially; callers arriving while another attempt is
+    running or before the next retry is due return immediately.
+    """
+    global _blockchain_retry_at, _blockchain_retry_delay
+    
+    if blockchain.connected or time.monotonic() < _blockchain_retry_at:
+        return blockchain.connected
+    if not _blockchain_connect_lock.acquire(blocking=False):
+        return blockchain.connected
+    
+    try:
+        try:
+            connected = run_async(blockchain.connect())
+        except Exception as e:
+            print(f"Error connecting to blockchain: {e}")
+            connected = False
+        
+        if connected:
+            _blockchain_retry_delay = BLOCKCHAIN_RETRY_MIN
+        else:
+            _blockchain_retry_at = time.monotonic() + _blockchain_retry_delay
+            _blockchain_retry_delay = min(BLOCKCHAIN_RETRY_MAX, _blockchain_retry_delay * 2)
+        return connected
+    finally:
+        _blockchain_connect_lock.release()
+
+def _create_agents():
+    """Create disaster management agents sharing one blockchain manager
+    
+    The manager is connected separately by ensure_blockchain_connected, so a slow or
+    unreachable RPC endpoint does not prevent the agents from being created.
+    """
     if not SYSTEM_AVAILABLE:
-        return False
+        return None
     
     try:
         setup_logging()
@@ -98,16 +266,23 @@ def initialize_agents():
             }
         }
         
-        # Create agents
-        watchtower = WatchtowerAgent(watchtower_config)
-        auditor = AuditorAgent(auditor_config)
-        treasurer = TreasurerAgent(treasurer_config)
+        # One manager shared by all requests instead of re-handshaking each time
+        blockchain = BlockchainManager(treasurer_config['blockchain'])
         
-        return True
+        # Create agents
+        return (
+            WatchtowerAgent(watchtower_config),
+            AuditorAgent(auditor_config),
+            TreasurerAgent(treasurer_config, blockchain=blockchain)
+        )
         
     except Exception as e:
         print(f"Error initializing agents: {e}")
-        return False
+        return None
+
+def initialize_agents():
+    """Initialize disaster management agents"""
+    return get_agents() is not None
 
 @app.route('/')
 def index():
@@ -124,7 +299,7 @@ def get_status():
     """Get system status"""
     try:
         if not SYSTEM_AVAILABLE:
-            return jsonify({
+            return fast_jsonify({
                 'blockchain': {
                     'status': 'connected',
                     'network': 'Sepolia Testnet',
@@ -139,21 +314,20 @@ def get_status():
             })
         
         # Get real status from agents
+        watchtower, auditor, treasurer = get_agents() or (None, None, None)
         blockchain_status = 'offline'
         balance = '0.0000'
         address = 'Not connected'
         
-        if treasurer and treasurer.blockchain:
+        if treasurer and ensure_blockchain_connected(treasurer.blockchain):
             try:
-                connected = asyncio.run(treasurer.blockchain.connect())
-                if connected:
-                    blockchain_status = 'connected'
-                    address = treasurer.blockchain.address
-                    balance = str(asyncio.run(treasurer.blockchain.get_balance()))
+                blockchain_status = 'connected'
+                address = treasurer.blockchain.address
+                balance = str(run_async(treasurer.get_balance()))
             except:
                 pass
         
-        return jsonify({
+        return fast_jsonify({
             'blockchain': {
                 'status': blockchain_status,
                 'network': 'Sepolia Testnet',
@@ -168,14 +342,14 @@ def get_status():
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return fast_jsonify({'error': str(e)}, 500)
 
 @app.route('/api/test-disaster', methods=['POST'])
 @limiter.limit("10 per minute")  # Limit AI processing
 def test_disaster():
     """Test disaster detection"""
     try:
-        if not SYSTEM_AVAILABLE or not watchtower:
+        if not SYSTEM_AVAILABLE or not get_agents():
             # Return mock data
             return jsonify({
                 'status': 'success',
@@ -185,34 +359,43 @@ def test_disaster():
                 'coordinates': '(34.0522, -118.2437)'
             })
         
-        # Check if image file exists
-        image_path = '../test_images/intense_fire.jpg'
-        if not os.path.exists(image_path):
-            print(f"Image file not found: {image_path}")
-            print(f"Current directory: {os.getcwd()}")
-            print(f"Files in parent directory: {os.listdir('..')}")
-            return jsonify({'status': 'error', 'error': f'Image file not found: {image_path}'})
+        # Image existence is checked once at startup
+        if not TEST_IMAGE_EXISTS:
+            print(f"Image file not found: {TEST_IMAGE_PATH}")
+            return jsonify({'status': 'error', 'error': 'Test image file not found'})
+        
+        print(f"Processing image: {TEST_IMAGE_PATH}")
         
-        print(f"Processing image: {image_path}")
+        # Run real disaster detection in the background; the client polls for the result
+        job_id = submit_detection_job(TEST_IMAGE_PATH, TEST_COORDINATES)
+        
+        return jsonify({'status': 'queued', 'job_id': job_id}), 202
+            
+    except Exception as e:
+        print(f"Error in test_disaster: {e}")
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
+@app.route('/api/test-disaster/<job_id>')
+@limiter.exempt
+def test_disaster_result(job_id):
+    """Get the result of a queued disaster detection job"""
+    try:
+        with detection_jobs_lock:
+            future = detection_jobs.get(job_id)
+            if future is None:
+                return jsonify({'status': 'error', 'error': f'Unknown job: {job_id}'}), 404
+            if not future.done():
+                return jsonify({'status': 'processing', 'job_id': job_id}), 202
+            del detection_jobs[job_id]
         
-        # Run real disaster detection
-        result = asyncio.run(watchtower.process_test_image(image_path, (34.0522, -118.2437)))
+        result = future.result()
         
         print(f"Detection result: {result}")
         
-        if result:
-            return jsonify({
-                'status': 'success',
-                'disaster_type': result.disaster_type.upper(),
-                'confidence': int(result.confidence * 100),
-                'severity': result.severity_score,
-                'coordinates': f"({result.coordinates[0]}, {result.coordinates[1]})"
-            })
-        else:
-            return jsonify({'status': 'no_disaster'})
+        return jsonify(detection_response(result))
             
     except Exception as e:
-        print(f"Error in test_disaster: {e}")
+        print(f"Error in test_disaster_result: {e}")
         return jsonify({'status': 'error', 'error': str(e)}), 500
 
 @app.route('/api/full-test', methods=['POST'])
@@ -220,7 +403,7 @@ def test_disaster():
 def full_test():
     """Run full system test"""
     try:
-        if not SYSTEM_AVAILABLE:
+        if not SYSTEM_AVAILABLE or not get_agents():
             # Return mock data
             return jsonify({
                 'status': 'success',
@@ -245,20 +428,26 @@ def full_test():
             })
         
         # Run real full test
-        # Step 1: Disaster Detection
-        disaster_result = asyncio.run(watchtower.process_test_image('../test_images/intense_fire.jpg', (34.0522, -118.2437)))
+        watchtower, auditor, treasurer = get_agents()
+        
+        # Step 1: Disaster Detection (image existence is checked once at startup)
+        if not TEST_IMAGE_EXISTS:
+            print(f"Image file not found: {TEST_IMAGE_PATH}")
+            return jsonify({'status': 'no_disaster'})
+        
+        disaster_result = run_async(detect_disaster(watchtower, TEST_IMAGE_PATH, TEST_COORDINATES))
         
         if not disaster_result:
             return jsonify({'status': 'no_disaster'})
         
         # Step 2: Verification
-        verified_result = asyncio.run(auditor.verify_disaster(disaster_result))
+        verified_result = run_async(auditor.verify_disaster(disaster_result))
         
         if not verified_result or verified_result.verification_score < 60:
             return jsonify({'status': 'verification_failed'})
         
         # Step 3: Funding
-        funding_transaction = asyncio.run(treasurer.distribute_funding(verified_result))
+        funding_transaction = run_async(treasurer.distribute_funding(verified_result))
         
         if not funding_transaction:
             return jsonify({'status': 'funding_failed'})
@@ -294,7 +483,7 @@ def get_stats():
     try:
         # For now, return mock stats
         # In a real implementation, you'd query your database
-        return jsonify({
+        return fast_jsonify({
             'disasters_detected': 5,
             'verified_events': 3,
             'total_funding': 0.015,
@@ -303,25 +492,25 @@ def get_stats():
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return fast_jsonify({'error': str(e)}, 500)
 
 @app.route('/health')
 def health_check():
     """Health check endpoint for load balancers"""
     try:
-        return jsonify({
+        return fast_jsonify({
             'status': 'healthy',
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': utc_now_iso(),
             'version': '1.0.0',
             'system_available': SYSTEM_AVAILABLE,
-            'agents_initialized': watchtower is not None and auditor is not None and treasurer is not None
+            'agents_initialized': agents_initialized()
         })
     except Exception as e:
-        return jsonify({
+        return fast_jsonify({
             'status': 'unhealthy',
             'error': str(e),
-            'timestamp': datetime.utcnow().isoformat()
-        }), 500
+            'timestamp': utc_now_iso()
+        }, 500)
 
 if __name__ == '__main__':
     print("🚨 Starting Disaster Management System Frontend...")
@@ -9,6 +9,7 @@ class DisasterManagementUI {
         
         this.isBackendConnected = false;
         this.apiBase = window.location.origin;
+        this.maxDetectionPolls = 60; // one poll per second
         
         this.init();
     }
@@ -219,7 +220,18 @@ class DisasterManagementUI {
                 }
             });
             
-            const result = await response.json();
+            let result = await response.json();
+            
+            // Detection runs in the background; poll until the job finishes or we give up
+            let polls = 0;
+            while (result.status === 'queued' || result.status === 'processing') {
+                if (++polls > this.maxDetectionPolls) {
+                    throw new Error('DETECTION TIMED OUT');
+                }
+                await this.delay(1000);
+                const poll = await fetch(`${this.apiBase}/api/test-disaster/${result.job_id}`);
+                result = await poll.json();
+            }
             
             if (result.status === 'success') {
                 this.updateCardStatus('detect', 'completed', 
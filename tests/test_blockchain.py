@@ -0,0 +1,83 @@
+"""
+Tests for BlockchainManager transaction sending against a stubbed Web3
+"""
+
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+
+from eth_account import Account
+
+from disaster_management_system.shared.blockchain import BlockchainManager
+
+
+RECIPIENT = '0x5D3f355f0EA186896802878E7Aa0b184469c3033'
+
+
+class FakeEth:
+    """Node stand-in whose pending nonce counts every accepted broadcast"""
+
+    def __init__(self, base_nonce=5, fail_nonces=()):
+        self.base_nonce = base_nonce
+        self.fail_nonces = set(fail_nonces)
+        self.broadcast = []
+
+    def get_transaction_count(self, address, block_identifier='latest'):
+        nonce = self.base_nonce + len(self.broadcast)
+        time.sleep(0.02)  # let concurrent callers interleave
+        return nonce
+
+    def send_raw_transaction(self, nonce):
+        if nonce in self.fail_nonces:
+            raise ValueError('replacement transaction underpriced')
+        self.broadcast.append(nonce)
+        return bytes([nonce])
+
+
+def make_manager(**eth_kwargs):
+    manager = BlockchainManager({'private_key': Account.create().key.hex()})
+    manager.logger.disabled = True
+    manager.w3 = SimpleNamespace(eth=FakeEth(**eth_kwargs), is_address=lambda address: True)
+    # Sign to the nonce itself so broadcasts can be checked without real transactions
+    manager._sign_transaction = (
+        lambda to_address, amount_eth, nonce, gas_limit=None, gas_price=None:
+        SimpleNamespace(raw_transaction=nonce)
+    )
+    return manager
+
+
+def make_recipients(count):
+    return [{'address': RECIPIENT, 'amount': 0.001, 'type': 'emergency_ngo'} for _ in range(count)]
+
+
+class TestSendMultipleTransactions(unittest.IsolatedAsyncioTestCase):
+    """Concurrent sends never reuse a nonce and a failure never leaves a gap"""
+
+    async def test_concurrent_batches_get_distinct_nonces(self):
+        manager = make_manager()
+
+        await asyncio.gather(
+            manager.send_multiple_transactions(make_recipients(3)),
+            manager.send_multiple_transactions(make_recipients(3)),
+            manager.send_transaction(RECIPIENT, 0.001)
+        )
+
+        self.assertEqual(sorted(manager.w3.eth.broadcast), list(range(5, 12)))
+
+    async def test_failed_broadcast_stops_the_batch(self):
+        manager = make_manager(fail_nonces={6})
+
+        results = await manager.send_multiple_transactions(make_recipients(3))
+
+        self.assertEqual([r['status'] for r in results], ['sent', 'failed', 'failed'])
+        self.assertEqual(manager.w3.eth.broadcast, [5])
+
+        # The next batch starts at the nonce that failed, leaving no gap
+        manager.w3.eth.fail_nonces.clear()
+        await manager.send_multiple_transactions(make_recipients(1))
+        self.assertEqual(manager.w3.eth.broadcast, [5, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for the in-memory message queue used when Redis is unavailable
+"""
+
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from disaster_management_system.shared import message_queue
+from disaster_management_system.shared.mock_redis import MockRedis
+
+
+class TestMockRedisBrpop(unittest.IsolatedAsyncioTestCase):
+    """brpop should block like Redis BRPOP instead of returning immediately"""
+
+    async def test_brpop_times_out_when_empty(self):
+        redis = MockRedis()
+
+        start = time.monotonic()
+        result = await redis.brpop("queue:test", timeout=0.2)
+
+        self.assertIsNone(result)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    async def test_brpop_wakes_up_on_lpush(self):
+        redis = MockRedis()
+
+        async def push_later():
+            await asyncio.sleep(0.05)
+            await redis.lpush("queue:test", "hello")
+
+        pusher = asyncio.create_task(push_later())
+        start = time.monotonic()
+        result = await redis.brpop("queue:test", timeout=5)
+        await pusher
+
+        self.assertEqual(result, (b"queue:test", b"hello"))
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    async def test_brpop_returns_queued_item_immediately(self):
+        redis = MockRedis()
+        await redis.lpush("queue:test", "first")
+        await redis.lpush("queue:test", "second")
+
+        self.assertEqual(await redis.brpop("queue:test"), (b"queue:test", b"first"))
+
+
+class TestMessageQueueMockMode(unittest.IsolatedAsyncioTestCase):
+    """MessageQueue falls back to the mock and must still deliver messages"""
+
+    async def asyncSetUp(self):
+        with mock.patch.object(message_queue, "REDIS_AVAILABLE", False):
+            self.queue = message_queue.MessageQueue()
+            await self.queue.connect()
+
+    async def test_publish_then_consume(self):
+        await self.queue.publish("auditor", "treasurer", {"value": 1})
+
+        messages = await self.queue.consume("treasurer")
+
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].payload, {"value": 1})
+
+    async def test_consume_blocks_until_timeout_when_empty(self):
+        start = time.monotonic()
+        messages = await self.queue.consume("treasurer", timeout=0.2)
+
+        self.assertEqual(messages, [])
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+"""
+Tests for the Treasurer agent's funding pipeline
+"""
+
+import asyncio
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from disaster_management_system.agents.treasurer import TreasurerAgent
+from disaster_management_system.shared import message_queue
+from disaster_management_system.shared.models import DisasterEvent, VerifiedEvent
+
+
+class FakeBlockchain:
+    """In-memory stand-in for BlockchainManager"""
+
+    def __init__(self, balance=1.0, tx_status='pending'):
+        self.balance = balance
+        self.tx_status = tx_status
+        self.balance_calls = 0
+        self.sent = 0
+
+    async def connect(self):
+        return True
+
+    async def fetch_balance(self, address=None):
+        self.balance_calls += 1
+        return self.balance
+
+    def transfer_fee_eth(self):
+        return 0.00042
+
+    def get_default_recipients(self, disaster_type):
+        return [{'address': '0xabc', 'type': 'emergency_ngo', 'percentage': 1.0}]
+
+    def calculate_recipient_amounts(self, total_amount, recipients):
+        return [
+            {'address': r['address'], 'amount': total_amount * r['percentage'], 'type': r['type']}
+            for r in recipients
+        ]
+
+    async def send_multiple_transactions(self, recipients):
+        results = []
+        for recipient in recipients:
+            self.sent += 1
+            results.append(dict(recipient, status='sent', transaction_hash=f'0x{self.sent}'))
+        return results
+
+    async def get_transaction_statuses(self, tx_hashes):
+        return [{'transaction_hash': h, 'status': self.tx_status} for h in tx_hashes]
+
+    async def get_network_info(self):
+        return {'connected': True}
+
+
+def make_verified_event(disaster_type='fire', funding_recommendation=0.5):
+    event = DisasterEvent(
+        event_id='',
+        disaster_type=disaster_type,
+        severity_score=0.5,
+        coordinates=(34.0, -118.0),
+        confidence=0.9,
+        timestamp=datetime.utcnow(),
+        image_analysis={}
+    )
+    return VerifiedEvent(
+        event_id=event.event_id,
+        original_event=event,
+        verification_score=90,
+        human_impact_estimate=500,
+        funding_recommendation=funding_recommendation,
+        verification_timestamp=datetime.utcnow(),
+        audit_details={}
+    )
+
+
+def make_treasurer(config=None, **blockchain_kwargs):
+    treasurer = TreasurerAgent(dict(config or {}), blockchain=FakeBlockchain(**blockchain_kwargs))
+    treasurer.logger.disabled = True
+    return treasurer
+
+
+class TestProcessingLoop(unittest.IsolatedAsyncioTestCase):
+    """The processing loop must not starve other tasks while idle"""
+
+    async def test_loop_yields_and_processes_messages_in_mock_mode(self):
+        with mock.patch.object(message_queue, "REDIS_AVAILABLE", False):
+            queue = message_queue.MessageQueue()
+            await queue.connect()
+
+        treasurer = make_treasurer()
+        treasurer.set_message_queue(queue)
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.05)
+
+        ticker_task = asyncio.create_task(ticker())
+        agent_task = asyncio.create_task(treasurer.start())
+        try:
+            await asyncio.sleep(0.2)
+            await queue.publish('auditor', 'treasurer', {'verified_event': make_verified_event().to_dict()})
+            await asyncio.sleep(0.3)
+        finally:
+            await treasurer.stop()
+            agent_task.cancel()
+            ticker_task.cancel()
+
+        self.assertGreaterEqual(ticks, 5)
+        self.assertEqual(len(treasurer.pending_transactions), 1)
+
+    async def test_queued_burst_is_priced_in_one_batch(self):
+        with mock.patch.object(message_queue, "REDIS_AVAILABLE", False):
+            queue = message_queue.MessageQueue()
+            await queue.connect()
+
+        treasurer = make_treasurer(balance=10.0)
+        treasurer.set_message_queue(queue)
+        for disaster_type in ('fire', 'flood', 'structural', 'casualty'):
+            await queue.publish('auditor', 'treasurer', {'verified_event': make_verified_event(disaster_type).to_dict()})
+
+        with mock.patch.object(treasurer, '_calculate_funding_amounts_batch',
+                               wraps=treasurer._calculate_funding_amounts_batch) as batch:
+            agent_task = asyncio.create_task(treasurer.start())
+            try:
+                await asyncio.sleep(0.2)
+            finally:
+                await treasurer.stop()
+                agent_task.cancel()
+
+        batch.assert_called_once()
+        self.assertEqual(len(batch.call_args.args[0]), 4)
+        self.assertEqual(len(treasurer.pending_transactions), 4)
+
+
+class TestBalanceCache(unittest.IsolatedAsyncioTestCase):
+    """Balance lookups are cached, but failed lookups are not"""
+
+    async def test_balance_is_cached_within_ttl(self):
+        treasurer = make_treasurer()
+
+        self.assertEqual(await treasurer.get_balance(), 1.0)
+        self.assertEqual(await treasurer.get_balance(), 1.0)
+        self.assertEqual(treasurer.blockchain.balance_calls, 1)
+
+    async def test_failed_fetch_is_not_cached(self):
+        treasurer = make_treasurer()
+        treasurer.blockchain.fetch_balance = mock.AsyncMock(side_effect=[ConnectionError('blip'), 1.0])
+
+        self.assertEqual(await treasurer.get_balance(), 0.0)
+        self.assertEqual(await treasurer.get_balance(), 1.0)
+        self.assertEqual(treasurer.blockchain.fetch_balance.await_count, 2)
+
+    async def test_distribute_debits_amount_and_gas_from_cached_balance(self):
+        treasurer = make_treasurer()
+        funding = await treasurer.distribute_funding(make_verified_event())
+
+        self.assertAlmostEqual(await treasurer.get_balance(), 1.0 - funding.total_amount - 0.00042)
+        self.assertEqual(treasurer.blockchain.balance_calls, 1)
+
+    async def test_distribute_skips_on_short_cached_balance_without_fetching(self):
+        treasurer = make_treasurer(balance=0.0)
+
+        self.assertIsNone(await treasurer.distribute_funding(make_verified_event()))
+        self.assertIsNone(await treasurer.distribute_funding(make_verified_event()))
+        self.assertEqual(treasurer.blockchain.balance_calls, 1)
+        self.assertEqual(treasurer.blockchain.sent, 0)
+
+    async def test_distribute_after_failed_fetch_retries_rpc(self):
+        treasurer = make_treasurer()
+        treasurer.blockchain.fetch_balance = mock.AsyncMock(side_effect=[ConnectionError('blip'), 1.0])
+
+        self.assertIsNone(await treasurer.distribute_funding(make_verified_event()))
+        self.assertIsNotNone(await treasurer.distribute_funding(make_verified_event()))
+        self.assertEqual(treasurer.blockchain.sent, 1)
+
+
+class TestFundingAmounts(unittest.TestCase):
+    """Scalar and batch funding calculations agree"""
+
+    def test_batch_matches_scalar(self):
+        treasurer = make_treasurer()
+        events = [
+            make_verified_event(disaster_type, recommendation)
+            for disaster_type in ('fire', 'flood', 'structural', 'casualty', 'unknown')
+            for recommendation in (0.0, 0.0005, 0.5, 50.0)
+        ]
+
+        batch = treasurer._calculate_funding_amounts_batch(events)
+        self.assertEqual(list(batch), [treasurer._calculate_funding_amount(e) for e in events])
+
+
+class TestFundingStats(unittest.IsolatedAsyncioTestCase):
+    """Funding totals stay correct across completion, eviction and emergency stop"""
+
+    async def test_totals_through_transaction_lifecycle(self):
+        treasurer = make_treasurer({'max_completed_transactions': 2}, balance=10.0)
+        amount = treasurer._calculate_funding_amount(make_verified_event())
+
+        for _ in range(3):
+            self.assertIsNotNone(await treasurer.distribute_funding(make_verified_event()))
+
+        stats = await treasurer.get_funding_stats()
+        self.assertEqual(stats['pending_transactions'], 3)
+        self.assertAlmostEqual(stats['pending_amount_eth'], 3 * amount)
+
+        # Confirming all three evicts the oldest record but keeps it in the totals
+        treasurer.blockchain.tx_status = 'confirmed'
+        await treasurer._check_pending_transactions()
+        self.assertEqual(len(treasurer.completed_transactions), 2)
+
+        stats = await treasurer.get_funding_stats()
+        self.assertEqual(stats['pending_transactions'], 0)
+        self.assertEqual(stats['completed_transactions'], 3)
+        self.assertEqual(stats['pending_amount_eth'], 0.0)
+        self.assertAlmostEqual(stats['completed_amount_eth'], 3 * amount)
+        self.assertEqual(stats['status_distribution'], {'confirmed': 3, 'failed': 0, 'timeout': 0})
+
+        treasurer.blockchain.tx_status = 'pending'
+        self.assertIsNotNone(await treasurer.distribute_funding(make_verified_event()))
+        result = await treasurer.emergency_stop_funding()
+        self.assertEqual(result['stopped_transactions'], 1)
+
+        stats = await treasurer.get_funding_stats()
+        self.assertEqual(stats['pending_transactions'], 0)
+        self.assertEqual(stats['completed_transactions'], 4)
+        self.assertAlmostEqual(stats['total_amount_eth'], 4 * amount)
+        self.assertEqual(treasurer._tx_table.status_counts['stopped'], 1)
+        self.assertEqual(len(treasurer._tx_table), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()